@@ -11,17 +11,37 @@ Endpoints:
 """
 import io
 import math
+import os
+import re
 import sys
+import threading
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional
 
 import fitz  # PyMuPDF
-from flask import Flask, request, jsonify
+import numpy as np
+import orjson
+from flask import Flask, request
+from scipy.spatial import cKDTree
 from flask_cors import CORS
 
 app = Flask(__name__)
 CORS(app)
 
+
+def _json_response(payload, status: int = 200):
+    """
+    Serialize a response with orjson — several times faster than the stdlib
+    json behind flask.jsonify on the multi-MB payloads /extract can return,
+    and it handles NumPy scalars/arrays natively.
+    """
+    return app.response_class(
+        orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+        status=status,
+        mimetype="application/json",
+    )
+
 # ─── Paper sizes in mm (landscape width) ───
 PAPER_WIDTHS_MM = {
     "A0": 1189,
@@ -31,6 +51,11 @@ PAPER_WIDTHS_MM = {
     "A4": 297,
 }
 
+_PAPER_SIZES = ("A0", "A1", "A2", "A3", "A4")
+
+# Scale patterns: "1:100", "SCALE 1:50", etc. Compiled once at import
+_SCALE_RE = re.compile(r'(?:SCALE\s*)?1\s*:\s*(\d+)')
+
 # ─── Colour helpers ───
 
 def rgb_to_hex(r: float, g: float, b: float) -> str:
@@ -68,12 +93,29 @@ def cmyk_to_rgb(c: float, m: float, y: float, k: float) -> tuple:
     return (r, g, b)
 
 
+def classify_colours(rgb: np.ndarray, sat_threshold: float = 0.15) -> tuple:
+    """
+    Batch version of is_coloured + rgb_to_hex over an (N, 3) array of strokes.
+    Returns (mask, packed) where mask flags meaningfully coloured strokes and
+    packed holds uint32 (R<<16)|(G<<8)|B values ready for hex formatting.
+    """
+    brightness = rgb.mean(axis=1)
+    max_c = rgb.max(axis=1)
+    min_c = rgb.min(axis=1)
+    saturation = np.divide(max_c - min_c, max_c,
+                           out=np.zeros_like(max_c), where=max_c > 0)
+    mask = (brightness > 0.08) & (brightness < 0.94) & (saturation > sat_threshold)
+    scaled = (rgb * 255).astype(np.uint32)
+    packed = (scaled[:, 0] << 16) | (scaled[:, 1] << 8) | scaled[:, 2]
+    return mask, packed
+
+
 # ─── Path extraction ───
 
 def extract_coloured_paths(page: fitz.Page):
     """
     Extract all coloured (non-grey) stroked paths from a PDF page.
-    Returns list of dicts: {colour, points, length_pdf_units, bbox}
+    Returns list of dicts: {colour, _arr (point array), length_pdf_units, bbox}
     
     Uses PyMuPDF's path extraction which reads ALL content including OCG layers.
     This is the key advantage over pdfjs-dist which only reads the default layer.
@@ -81,92 +123,186 @@ def extract_coloured_paths(page: fitz.Page):
     paths = []
     
     try:
-        # page.get_drawings() returns all vector paths including from OCG layers
-        drawings = page.get_drawings()
+        # page.get_cdrawings() returns all vector paths including from OCG
+        # layers, as raw dicts with plain (x, y) tuples — no per-vertex Point
+        # object construction like get_drawings()
+        drawings = page.get_cdrawings()
     except Exception as e:
-        print(f"[Vector] get_drawings() failed: {e}", file=sys.stderr)
+        print(f"[Vector] get_cdrawings() failed: {e}", file=sys.stderr)
         return paths
 
-    for drawing in drawings:
-        # We only care about stroked paths (not fills)
-        stroke_colour = drawing.get("color")
-        if stroke_colour is None:
-            continue
-        
-        # stroke_colour is a tuple of floats, length depends on colour space
-        r, g, b = 0.0, 0.0, 0.0
+    # Cheap first-pass rejection in a single comprehension, so pages that are
+    # mostly black text and hatching never reach the per-drawing work below:
+    # fill-only paths have no stroke colour, single-channel greys can never
+    # pass the saturation check, and RGB strokes whose brightest channel sits
+    # at or below the 0.08 brightness floor can't classify as coloured.
+    drawings = [
+        d for d in drawings
+        if (stroke := d.get("color")) is not None and (
+            (len(stroke) == 3 and max(stroke) > 0.08) or len(stroke) == 4
+        )
+    ]
+
+    if not drawings:
+        return paths
+
+    # Second pass: collect stroke colours so classification runs as one batch
+    # kernel instead of ~3 Python calls per drawing. Strokes are bucketed by
+    # colour space (RGB / CMYK) so the CMYK conversion runs as one vectorized
+    # expression rather than a tuple-allocating call per drawing.
+    candidates = drawings
+    rgb_rows, rgb_idx = [], []
+    cmyk_rows, cmyk_idx = [], []
+    for row, drawing in enumerate(candidates):
+        stroke_colour = drawing["color"]
         if len(stroke_colour) == 3:
-            r, g, b = stroke_colour
-        elif len(stroke_colour) == 4:
-            r, g, b = cmyk_to_rgb(*stroke_colour)
-        elif len(stroke_colour) == 1:
-            r = g = b = stroke_colour[0]
+            rgb_rows.append(stroke_colour)
+            rgb_idx.append(row)
         else:
-            continue
+            cmyk_rows.append(stroke_colour)
+            cmyk_idx.append(row)
+
+    rgb = np.empty((len(candidates), 3), dtype=np.float64)
+    if rgb_idx:
+        rgb[rgb_idx] = rgb_rows
+    if cmyk_idx:
+        cmyk = np.asarray(cmyk_rows, dtype=np.float64)
+        rgb[cmyk_idx] = (1.0 - cmyk[:, :3]) * (1.0 - cmyk[:, 3:4])
+
+    mask, packed = classify_colours(rgb)
 
-        if not is_coloured(r, g, b):
+    for idx, drawing in enumerate(candidates):
+        if not mask[idx]:
             continue
 
-        hex_colour = rgb_to_hex(r, g, b)
-        
-        # Extract path points from items
-        points = []
+        hex_colour = f"#{packed[idx]:06x}"
+
+        # Extract path points from items into a flat coords list — scalar
+        # last_x/last_y track the dedup check so no per-point tuples are built
+        coords = []
+        last_x = last_y = None
         for item in drawing.get("items", []):
             op = item[0]  # operation type: "l" (line), "c" (curve), "re" (rect), etc.
             if op == "l":  # line
                 p1, p2 = item[1], item[2]
-                if not points or (points[-1] != (p1.x, p1.y)):
-                    points.append((p1.x, p1.y))
-                points.append((p2.x, p2.y))
             elif op == "c":  # cubic bezier
                 # Use start and end points (skip control points)
-                p1, p4 = item[1], item[4]
-                if not points or (points[-1] != (p1.x, p1.y)):
-                    points.append((p1.x, p1.y))
-                points.append((p4.x, p4.y))
+                p1, p2 = item[1], item[4]
             elif op == "re":  # rectangle — skip (not a tray line)
                 continue
             elif op == "qu":  # quad — skip
                 continue
-
-        if len(points) < 2:
+            else:
+                continue
+            if last_x != p1[0] or last_y != p1[1]:
+                coords.append(p1[0])
+                coords.append(p1[1])
+            coords.append(p2[0])
+            coords.append(p2[1])
+            last_x, last_y = p2
+
+        if len(coords) < 4:
             continue
 
-        # Calculate total path length in PDF units
-        total_length = 0.0
-        for i in range(len(points) - 1):
-            dx = points[i+1][0] - points[i][0]
-            dy = points[i+1][1] - points[i][1]
-            total_length += math.sqrt(dx*dx + dy*dy)
+        arr = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+
+        # Calculate total path length in PDF units (vectorized — per-point
+        # Python arithmetic dominates on pages with thousands of path items)
+        diffs = np.diff(arr, axis=0)
+        total_length = float(np.hypot(diffs[:, 0], diffs[:, 1]).sum())
 
         if total_length < 5.0:  # skip tiny fragments
             continue
 
-        # Bounding box
-        xs = [p[0] for p in points]
-        ys = [p[1] for p in points]
+        # Bounding box from the same array
+        x0, y0 = arr.min(axis=0)
+        x1, y1 = arr.max(axis=0)
 
         paths.append({
             "colour": hex_colour,
-            "points": points,
+            "_arr": arr,  # point array, reused by merge_connected_paths
+            "_start": (coords[0], coords[1]),  # endpoints, pre-extracted for merge
+            "_end": (last_x, last_y),
             "length_pdf_units": total_length,
             "bbox": {
-                "x0": min(xs), "y0": min(ys),
-                "x1": max(xs), "y1": max(ys),
+                "x0": float(x0), "y0": float(y0),
+                "x1": float(x1), "y1": float(y1),
             },
         })
 
     return paths
 
 
+def _nearest_free_endpoint(from_point: tuple, neighbours: list, endpoints, used: list) -> Optional[int]:
+    """
+    Pick the closest unused endpoint among KD-tree matches for a chain end.
+    `neighbours` is a list of endpoint indices (path index = endpoint // 2).
+
+    Compares squared distances — ordering is the same and it skips a sqrt
+    per candidate in this hot loop.
+    """
+    best = None
+    best_d2 = None
+    for e in neighbours:
+        if used[e // 2]:
+            continue
+        dx = endpoints[e][0] - from_point[0]
+        dy = endpoints[e][1] - from_point[1]
+        d2 = dx*dx + dy*dy
+        if best is None or d2 < best_d2:
+            best, best_d2 = e, d2
+    return best
+
+
+def _build_run(colour: str, arr: np.ndarray) -> dict:
+    """
+    Build a run dict (lengths, bbox, midpoint, segments) from a merged point
+    array. Segments already carry every coordinate, so the raw point list is
+    not kept — it would double the run's footprint through serialization for
+    geometry the response encodes anyway.
+    """
+    diffs = np.diff(arr, axis=0)
+    seg_lens = np.hypot(diffs[:, 0], diffs[:, 1])
+    total_length = float(seg_lens.sum())
+
+    # Round everything in two batch calls rather than 5 round() calls per
+    # segment; tolist() hands back plain Python floats for serialization
+    pts_r = np.round(arr, 1).tolist()
+    seg_lens_r = np.round(seg_lens, 2).tolist()
+    segments = [
+        {"x1": p1[0], "y1": p1[1], "x2": p2[0], "y2": p2[1], "length_pdf_units": seg_len}
+        for p1, p2, seg_len in zip(pts_r, pts_r[1:], seg_lens_r)
+    ]
+
+    x0, y0 = arr.min(axis=0)
+    x1, y1 = arr.max(axis=0)
+    midx, midy = arr.mean(axis=0)
+
+    return {
+        "colour": colour,
+        "length_pdf_units": total_length,
+        "segment_count": len(arr) - 1,
+        "bbox": {
+            "x0": float(x0), "y0": float(y0),
+            "x1": float(x1), "y1": float(y1),
+        },
+        "midpoint": {"x": round(float(midx), 1), "y": round(float(midy), 1)},
+        "segments": segments,
+    }
+
+
 def merge_connected_paths(paths: list, merge_distance: float = 5.0) -> list:
     """
     Merge paths of the same colour that are connected (endpoints close together).
     This handles cases where a single tray run is drawn as multiple path segments.
+
+    Endpoint matching uses a KD-tree (one query_pairs call per colour group)
+    instead of re-scanning every remaining path against the growing run, which
+    was O(N²)-O(N³) in Python for drawings with thousands of segments.
     """
     if not paths:
         return []
-    
+
     # Group by colour
     colour_groups = defaultdict(list)
     for p in paths:
@@ -174,81 +310,84 @@ def merge_connected_paths(paths: list, merge_distance: float = 5.0) -> list:
 
     merged = []
     for colour, group in colour_groups.items():
-        # Simple greedy merge: for each path, try to connect to existing merged paths
-        runs = []
-        remaining = list(group)
-
-        while remaining:
-            current = remaining.pop(0)
-            current_points = list(current["points"])
-            changed = True
-
-            while changed:
-                changed = False
-                new_remaining = []
-                for candidate in remaining:
-                    # Check if candidate connects to current path
-                    c_start = candidate["points"][0]
-                    c_end = candidate["points"][-1]
-                    cur_start = current_points[0]
-                    cur_end = current_points[-1]
-
-                    # Check all four possible connections
-                    d1 = math.sqrt((cur_end[0]-c_start[0])**2 + (cur_end[1]-c_start[1])**2)
-                    d2 = math.sqrt((cur_end[0]-c_end[0])**2 + (cur_end[1]-c_end[1])**2)
-                    d3 = math.sqrt((cur_start[0]-c_start[0])**2 + (cur_start[1]-c_start[1])**2)
-                    d4 = math.sqrt((cur_start[0]-c_end[0])**2 + (cur_start[1]-c_end[1])**2)
-
-                    if d1 < merge_distance:
-                        current_points.extend(candidate["points"][1:])
-                        changed = True
-                    elif d2 < merge_distance:
-                        current_points.extend(reversed(candidate["points"][:-1]))
-                        changed = True
-                    elif d3 < merge_distance:
-                        current_points = list(reversed(candidate["points"][:-1])) + current_points
-                        changed = True
-                    elif d4 < merge_distance:
-                        current_points = list(candidate["points"]) + current_points[1:]
-                        changed = True
-                    else:
-                        new_remaining.append(candidate)
-
-                remaining = new_remaining
-
-            # Calculate merged length
-            total_length = 0.0
-            segments = []
-            for i in range(len(current_points) - 1):
-                x1, y1 = current_points[i]
-                x2, y2 = current_points[i+1]
-                seg_len = math.sqrt((x2-x1)**2 + (y2-y1)**2)
-                total_length += seg_len
-                segments.append({
-                    "x1": round(x1, 1), "y1": round(y1, 1),
-                    "x2": round(x2, 1), "y2": round(y2, 1),
-                    "length_pdf_units": round(seg_len, 2),
-                })
+        n = len(group)
+        if n == 1:
+            merged.append(_build_run(colour, group[0]["_arr"]))
+            continue
 
-            xs = [p[0] for p in current_points]
-            ys = [p[1] for p in current_points]
-            midx = sum(xs) / len(xs)
-            midy = sum(ys) / len(ys)
-
-            runs.append({
-                "colour": colour,
-                "points": current_points,
-                "length_pdf_units": total_length,
-                "segment_count": len(current_points) - 1,
-                "bbox": {
-                    "x0": min(xs), "y0": min(ys),
-                    "x1": max(xs), "y1": max(ys),
-                },
-                "midpoint": {"x": round(midx, 1), "y": round(midy, 1)},
-                "segments": segments,
-            })
+        # Endpoint list: path i contributes entries 2i (start) and 2i+1 (end).
+        # Kept as plain tuples — tuple indexing in the chain walk is much
+        # cheaper than pulling rows out of an ndarray one at a time.
+        endpoints = []
+        for p in group:
+            endpoints.append(p["_start"])
+            endpoints.append(p["_end"])
+
+        tree = cKDTree(endpoints)
+        pairs = tree.query_pairs(r=merge_distance, output_type="ndarray")
+
+        # Adjacency between endpoints of *different* paths
+        adjacency = defaultdict(list)
+        for ea, eb in pairs:
+            if ea // 2 == eb // 2:
+                continue
+            adjacency[int(ea)].append(int(eb))
+            adjacency[int(eb)].append(int(ea))
 
-        merged.extend(runs)
+        used = [False] * n
+        for i in range(n):
+            if used[i]:
+                continue
+            used[i] = True
+            # Chain is assembled as a list of array slices, concatenated once.
+            # cur_start/cur_end locals track the live chain ends so the walk
+            # never re-indexes the growing parts list.
+            parts = [group[i]["_arr"]]
+            cur_start = group[i]["_start"]
+            cur_end = group[i]["_end"]
+
+            # Extend forward from the end of path i
+            e = 2*i + 1
+            while True:
+                nxt = _nearest_free_endpoint(cur_end, adjacency.get(e, ()), endpoints, used)
+                if nxt is None:
+                    break
+                j = nxt // 2
+                used[j] = True
+                candidate = group[j]
+                if nxt == 2*j:
+                    # candidate start touches run end → append forward
+                    parts.append(candidate["_arr"][1:])
+                    cur_end = candidate["_end"]
+                    e = 2*j + 1
+                else:
+                    # candidate end touches run end → append reversed
+                    parts.append(candidate["_arr"][-2::-1])
+                    cur_end = candidate["_start"]
+                    e = 2*j
+
+            # Extend backward from the start of path i
+            e = 2*i
+            while True:
+                nxt = _nearest_free_endpoint(cur_start, adjacency.get(e, ()), endpoints, used)
+                if nxt is None:
+                    break
+                j = nxt // 2
+                used[j] = True
+                candidate = group[j]
+                if nxt == 2*j:
+                    # candidate start touches run start → prepend reversed
+                    parts.insert(0, candidate["_arr"][:0:-1])
+                    cur_start = candidate["_end"]
+                    e = 2*j + 1
+                else:
+                    # candidate end touches run start → prepend forward
+                    parts.insert(0, candidate["_arr"][:-1])
+                    cur_start = candidate["_start"]
+                    e = 2*j
+
+            arr = parts[0] if len(parts) == 1 else np.concatenate(parts)
+            merged.append(_build_run(colour, arr))
 
     return merged
 
@@ -280,14 +419,12 @@ def detect_scale_from_text(page: fitz.Page) -> tuple:
     scale = None
     paper_size = None
 
-    # Scale patterns: "1:100", "SCALE 1:50", etc.
-    import re
-    scale_match = re.search(r'(?:SCALE\s*)?1\s*:\s*(\d+)', text)
+    scale_match = _SCALE_RE.search(text)
     if scale_match:
         scale = f"1:{scale_match.group(1)}"
 
     # Paper size
-    for size in ["A0", "A1", "A2", "A3", "A4"]:
+    for size in _PAPER_SIZES:
         if size in text:
             paper_size = size
             break
@@ -295,11 +432,82 @@ def detect_scale_from_text(page: fitz.Page) -> tuple:
     return scale, paper_size
 
 
+# ─── Per-page processing ───
+
+# PyMuPDF releases the GIL in C but fitz Document objects aren't picklable,
+# so each worker re-opens the document from bytes. Sized once at import;
+# worker processes only spawn on first use.
+_PAGE_POOL = ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, 4))
+
+
+def process_page(pdf_bytes: bytes, page_number: int) -> dict:
+    """
+    Extract + merge coloured paths for a single page.
+    Safe to run in a worker process: takes raw bytes in, plain dicts out.
+    """
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        page = doc[page_number - 1]
+        rect = page.rect
+        detected_scale, detected_paper = detect_scale_from_text(page)
+        raw_paths = extract_coloured_paths(page)
+        runs = merge_connected_paths(raw_paths)
+    finally:
+        doc.close()
+
+    return {
+        "page": page_number,
+        "page_width": rect.width,
+        "page_height": rect.height,
+        "detected_scale": detected_scale,
+        "detected_paper": detected_paper,
+        "raw_path_count": len(raw_paths),
+        "runs": runs,
+    }
+
+
+def _parse_pages(pages_param: str, page_count: int) -> list:
+    """
+    Parse the pages query param: 'all', a range '2-5', or a list '1,3,7'.
+    Raises ValueError for anything that doesn't yield at least one page,
+    including reversed ranges like '2-1'.
+    """
+    if pages_param.lower() == "all":
+        pages = list(range(1, page_count + 1))
+    elif "-" in pages_param:
+        start, end = pages_param.split("-", 1)
+        pages = list(range(int(start), int(end) + 1))
+    else:
+        pages = [int(p) for p in pages_param.split(",")]
+    if not pages:
+        raise ValueError(f"no pages in '{pages_param}'")
+    return pages
+
+
+def _warmup():
+    """
+    Exercise MuPDF once on a throwaway in-memory page so its internal caches
+    are primed off the request path — keeps first-request latency low on
+    autoscaled cold starts.
+    """
+    try:
+        doc = fitz.open()
+        page = doc.new_page()
+        page.draw_line((0, 0), (10, 10))
+        page.get_cdrawings()
+        doc.close()
+    except Exception as e:
+        print(f"[Vector] warmup failed: {e}", file=sys.stderr)
+
+
+threading.Thread(target=_warmup, name="mupdf-warmup", daemon=True).start()
+
+
 # ─── API endpoints ───
 
 @app.route("/health", methods=["GET"])
 def health():
-    return jsonify({"status": "ok", "service": "vector-extraction", "version": "1.0.0"})
+    return _json_response({"status": "ok", "service": "vector-extraction", "version": "1.0.0"})
 
 
 @app.route("/extract", methods=["POST"])
@@ -312,125 +520,137 @@ def extract():
       - scale: e.g. "100" (for 1:100). Auto-detected if not provided.
       - paper_size: e.g. "A1". Auto-detected if not provided.
       - page: page number (default 1)
+      - pages: multi-page selection, e.g. "1-3", "1,4,7" or "all".
+        Overrides `page`; pages are processed in parallel workers.
     """
     if "pdf" not in request.files:
-        return jsonify({"error": "No PDF file uploaded. Send as multipart form with field name 'pdf'"}), 400
+        return _json_response({"error": "No PDF file uploaded. Send as multipart form with field name 'pdf'"}, 400)
 
     pdf_file = request.files["pdf"]
     pdf_bytes = pdf_file.read()
 
     if len(pdf_bytes) < 100:
-        return jsonify({"error": "PDF file appears to be empty or too small"}), 400
+        return _json_response({"error": "PDF file appears to be empty or too small"}, 400)
 
     # Query params
     scale_param = request.args.get("scale", "")
     paper_param = request.args.get("paper_size", "")
+    pages_param = request.args.get("pages", "")
     page_num = int(request.args.get("page", "1"))
 
     try:
         doc = fitz.open(stream=pdf_bytes, filetype="pdf")
     except Exception as e:
-        return jsonify({"error": f"Failed to open PDF: {str(e)}"}), 400
-
-    if page_num < 1 or page_num > len(doc):
-        return jsonify({"error": f"Page {page_num} out of range (document has {len(doc)} pages)"}), 400
-
-    page = doc[page_num - 1]
-    rect = page.rect
-    page_width = rect.width
-    page_height = rect.height
-
-    # Detect scale from text if not provided
-    detected_scale, detected_paper = detect_scale_from_text(page)
-    scale = f"1:{scale_param}" if scale_param else (detected_scale or "1:100")
-    paper_size = paper_param or detected_paper or "A0"
-
-    metres_per_unit = get_metres_per_pdf_unit(scale, paper_size, page_width)
+        return _json_response({"error": f"Failed to open PDF: {str(e)}"}, 400)
 
-    print(f"[Vector] Page {page_num}: {page_width:.0f}x{page_height:.0f}, "
-          f"scale={scale}, paper={paper_size}, m/unit={metres_per_unit:.6f}")
+    page_count = len(doc)
+    doc.close()
 
-    # Extract coloured paths
-    raw_paths = extract_coloured_paths(page)
-    print(f"[Vector] Found {len(raw_paths)} coloured path segments")
+    if pages_param:
+        try:
+            page_numbers = _parse_pages(pages_param, page_count)
+        except ValueError:
+            return _json_response({"error": f"Invalid pages parameter: '{pages_param}'"}, 400)
+    else:
+        page_numbers = [page_num]
 
-    if len(raw_paths) == 0:
-        doc.close()
-        return jsonify({
-            "page_width": round(page_width, 1),
-            "page_height": round(page_height, 1),
-            "scale": scale,
-            "paper_size": paper_size,
-            "metres_per_pdf_unit": metres_per_unit,
-            "total_coloured_paths": 0,
-            "runs": [],
-            "colour_summary": {},
-        })
+    for p in page_numbers:
+        if p < 1 or p > page_count:
+            return _json_response({"error": f"Page {p} out of range (document has {page_count} pages)"}, 400)
 
-    # Merge connected paths into runs
-    runs = merge_connected_paths(raw_paths)
-    print(f"[Vector] Merged into {len(runs)} connected runs")
+    # Single page runs inline; multi-page fans out across worker processes
+    if len(page_numbers) == 1:
+        results = [process_page(pdf_bytes, page_numbers[0])]
+    else:
+        results = list(_PAGE_POOL.map(
+            process_page, [pdf_bytes] * len(page_numbers), page_numbers))
 
     # Convert to real-world lengths and build response
     response_runs = []
-    colour_summary = defaultdict(lambda: {"run_count": 0, "total_length_metres": 0.0})
+    total_raw_paths = 0
+    first_metres_per_unit = None
+
+    for result in results:
+        # Detected scale/paper can differ per page; params override both
+        scale = f"1:{scale_param}" if scale_param else (result["detected_scale"] or "1:100")
+        paper_size = paper_param or (result["detected_paper"] or "A0")
+        metres_per_unit = get_metres_per_pdf_unit(scale, paper_size, result["page_width"])
+        if first_metres_per_unit is None:
+            first_metres_per_unit = metres_per_unit
+
+        print(f"[Vector] Page {result['page']}: "
+              f"{result['page_width']:.0f}x{result['page_height']:.0f}, "
+              f"scale={scale}, paper={paper_size}, m/unit={metres_per_unit:.6f}")
+        print(f"[Vector] Found {result['raw_path_count']} coloured path segments, "
+              f"merged into {len(result['runs'])} connected runs")
+        total_raw_paths += result["raw_path_count"]
+
+        for run in result["runs"]:
+            length_metres = round(run["length_pdf_units"] * metres_per_unit, 2)
+
+            # Skip very short runs (likely drawing artifacts)
+            if length_metres < 0.5:
+                continue
 
-    for run in runs:
-        length_metres = round(run["length_pdf_units"] * metres_per_unit, 2)
-        
-        # Skip very short runs (likely drawing artifacts)
-        if length_metres < 0.5:
-            continue
+            # Convert segments to metres
+            segments_metres = []
+            for seg in run.get("segments", []):
+                segments_metres.append({
+                    "x1": seg["x1"],
+                    "y1": seg["y1"],
+                    "x2": seg["x2"],
+                    "y2": seg["y2"],
+                    "length_metres": round(seg["length_pdf_units"] * metres_per_unit, 2),
+                })
 
-        # Convert segments to metres
-        segments_metres = []
-        for seg in run.get("segments", []):
-            segments_metres.append({
-                "x1": seg["x1"],
-                "y1": seg["y1"],
-                "x2": seg["x2"],
-                "y2": seg["y2"],
-                "length_metres": round(seg["length_pdf_units"] * metres_per_unit, 2),
+            response_runs.append({
+                "colour": run["colour"],
+                "page": result["page"],
+                "total_length_metres": length_metres,
+                "total_length_pdf_units": round(run["length_pdf_units"], 2),
+                "segment_count": run["segment_count"],
+                "bbox": run["bbox"],
+                "midpoint": run["midpoint"],
+                "segments": segments_metres,
             })
 
-        response_runs.append({
-            "colour": run["colour"],
-            "total_length_metres": length_metres,
-            "total_length_pdf_units": round(run["length_pdf_units"], 2),
-            "segment_count": run["segment_count"],
-            "bbox": run["bbox"],
-            "midpoint": run["midpoint"],
-            "segments": segments_metres,
-        })
-
-        colour_summary[run["colour"]]["run_count"] += 1
-        colour_summary[run["colour"]]["total_length_metres"] += length_metres
-
-    # Round summary totals
-    for colour in colour_summary:
-        colour_summary[colour]["total_length_metres"] = round(
-            colour_summary[colour]["total_length_metres"], 2
-        )
-
     # Sort runs by length (longest first)
     response_runs.sort(key=lambda r: r["total_length_metres"], reverse=True)
 
-    doc.close()
+    # Aggregate the per-colour summary in one vectorized groupby instead of
+    # dict updates per run plus a trailing rounding pass
+    colour_summary = {}
+    if response_runs:
+        colours, inverse = np.unique(
+            [r["colour"] for r in response_runs], return_inverse=True)
+        run_counts = np.bincount(inverse)
+        totals = np.round(np.bincount(
+            inverse, weights=[r["total_length_metres"] for r in response_runs]), 2)
+        colour_summary = {
+            colour: {"run_count": int(count), "total_length_metres": total}
+            for colour, count, total in zip(colours.tolist(), run_counts, totals.tolist())
+        }
 
     print(f"[Vector] Returning {len(response_runs)} runs:")
     for colour, summary in colour_summary.items():
         print(f"[Vector]   {colour}: {summary['run_count']} runs, "
               f"{summary['total_length_metres']}m total")
 
-    return jsonify({
-        "page_width": round(page_width, 1),
-        "page_height": round(page_height, 1),
-        "scale": scale,
-        "paper_size": paper_size,
-        "metres_per_pdf_unit": metres_per_unit,
-        "total_coloured_paths": len(raw_paths),
+    # Top-level page metadata reflects the first requested page
+    first = results[0]
+    first_scale = f"1:{scale_param}" if scale_param else (first["detected_scale"] or "1:100")
+    first_paper = paper_param or (first["detected_paper"] or "A0")
+
+    return _json_response({
+        "page_width": round(first["page_width"], 1),
+        "page_height": round(first["page_height"], 1),
+        "scale": first_scale,
+        "paper_size": first_paper,
+        "metres_per_pdf_unit": first_metres_per_unit,
+        "pages": page_numbers,
+        "total_coloured_paths": total_raw_paths,
         "runs": response_runs,
-        "colour_summary": dict(colour_summary),
+        "colour_summary": colour_summary,
     })
 
 